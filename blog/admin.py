@@ -7,6 +7,7 @@ class ArticleAdmin(admin.ModelAdmin):
     list_filter = ['status', 'created_at', 'author']
     search_fields = ['title', 'content']
     prepopulated_fields = {'slug': ('title',)}
+    readonly_fields = ['version']
     
     fieldsets = (
         ('Informations générales', {
@@ -16,7 +17,7 @@ class ArticleAdmin(admin.ModelAdmin):
             'fields': ('content',)
         }),
         ('Publication', {
-            'fields': ('status', 'published_at')
+            'fields': ('status', 'published_at', 'version')
         }),
     )
 
@@ -1,4 +1,7 @@
-from django.db import models
+from contextlib import nullcontext
+
+from django.db import models, transaction
+from django.db.models import F
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils import timezone
@@ -45,6 +48,9 @@ class Article(models.Model):
         verbose_name="Statut"
     )
     
+    # Numéro de version (verrouillage optimiste contre les modifications concurrentes)
+    version = models.PositiveIntegerField(default=1, editable=False, verbose_name="Version")
+    
     class Meta:
         """Métadonnées pour le modèle"""
         # Tri par défaut : du plus récent au plus ancien
@@ -64,6 +70,76 @@ class Article(models.Model):
     def is_published(self):
         """Vérifie si l'article est publié"""
         return self.status == 'published' and self.published_at <= timezone.now()
+    
+    def save(self, *args, **kwargs):
+        """
+        Incrémente la version à chaque mise à jour (admin, shell...)
+        
+        Sans cela, une sauvegarde complète réécrirait la version en mémoire
+        et la ferait reculer.
+        """
+        update_fields = kwargs.get('update_fields')
+        if self._state.adding or (update_fields is not None and not update_fields):
+            return super().save(*args, **kwargs)
+        
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'version'}
+        
+        version = self.version
+        try:
+            with transaction.atomic():
+                # L'incrément atomique verrouille la ligne jusqu'à la fin de la sauvegarde
+                Article.objects.filter(pk=self.pk).update(version=F('version') + 1)
+                current = Article.objects.filter(pk=self.pk).values_list('version', flat=True).first()
+                if current is not None:
+                    self.version = current
+                super().save(*args, **kwargs)
+        except Exception:
+            self.version = version
+            raise
+    
+    def save_changes(self, fields, version):
+        """
+        Enregistre uniquement les champs modifiés si la version n'a pas changé
+        
+        Exécute un UPDATE ... WHERE version=? : retourne False si l'article
+        a été modifié entre-temps par quelqu'un d'autre.
+        """
+        fields = set(fields) | {'updated_at'}
+        
+        # Fichiers uploadés pendant cette requête, à supprimer en cas d'échec
+        new_files = []
+        for name in fields:
+            if isinstance(self._meta.get_field(name), models.FileField):
+                value = getattr(self, name)
+                if value and not value._committed:
+                    new_files.append(value)
+        
+        with transaction.atomic() if new_files else nullcontext():
+            if new_files:
+                # Vérifie la version avant d'écrire les fichiers sur le disque
+                locked = Article.objects.select_for_update().filter(pk=self.pk, version=version)
+                if not list(locked.values_list('pk', flat=True)):
+                    return False
+            
+            values = {}
+            for name in fields:
+                # pre_save gère auto_now et l'enregistrement des fichiers uploadés
+                values[name] = self._meta.get_field(name).pre_save(self, add=False)
+            
+            updated = Article.objects.filter(pk=self.pk, version=version).update(
+                version=F('version') + 1,
+                **values
+            )
+        
+        if not updated:
+            # Base sans verrou de ligne (SQLite) : on ne laisse pas de fichier orphelin
+            for file in new_files:
+                file.delete(save=False)
+            return False
+        
+        self.version = version + 1
+        return True
 
 class Comment(models.Model):
     """
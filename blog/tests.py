@@ -1,3 +1,219 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from .models import Article
+
+
+class ArticleVersionTests(TestCase):
+    """
+    Tests du verrouillage optimiste des articles
+    """
+    def setUp(self):
+        self.author = User.objects.create_user('auteur', password='secret')
+        self.article = Article.objects.create(
+            title='Titre', slug='titre', content='Contenu', author=self.author
+        )
+        self.client.login(username='auteur', password='secret')
+
+    def edit_data(self, **overrides):
+        data = {
+            'title': 'Titre',
+            'slug': 'titre',
+            'content': 'Contenu',
+            'status': 'draft',
+            'published_at': self.article.published_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'version': self.article.version,
+        }
+        data.update(overrides)
+        return data
+
+    def test_full_save_increments_version(self):
+        self.article.save()
+        self.assertEqual(self.article.version, 2)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.version, 2)
+
+    def test_failed_save_restores_version(self):
+        Article.objects.create(title='Autre', slug='autre', content='Contenu', author=self.author)
+        self.article.slug = 'autre'
+        with self.assertRaises(IntegrityError):
+            self.article.save()
+        self.assertEqual(self.article.version, 1)
+
+    def test_save_with_empty_update_fields_is_a_no_op(self):
+        with self.assertNumQueries(0):
+            self.article.save(update_fields=[])
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.version, 1)
+
+    def test_stale_full_save_does_not_move_version_back(self):
+        stale = Article.objects.get(pk=self.article.pk)
+        self.assertTrue(self.article.save_changes(['status'], 1))
+        stale.save()
+        stale.refresh_from_db()
+        self.assertEqual(stale.version, 3)
+
+    def test_admin_save_increments_version(self):
+        User.objects.create_superuser('admin', password='secret')
+        self.client.login(username='admin', password='secret')
+        url = reverse('admin:blog_article_change', args=[self.article.pk])
+        published_at = self.article.published_at
+        response = self.client.post(url, {
+            'title': 'Titre admin',
+            'slug': 'titre',
+            'author': self.author.pk,
+            'content': 'Contenu',
+            'status': 'draft',
+            'published_at_0': published_at.strftime('%Y-%m-%d'),
+            'published_at_1': published_at.strftime('%H:%M:%S'),
+        })
+        self.assertEqual(response.status_code, 302)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.title, 'Titre admin')
+        self.assertEqual(self.article.version, 2)
+
+    def article_selects(self, queries):
+        # Chargements de l'article, hors vérification d'unicité du slug (SELECT 1 ...)
+        return [q['sql'] for q in queries
+                if q['sql'].startswith('SELECT "blog_article"') and 'FROM "blog_article"' in q['sql']]
+
+    def test_edit_view_loads_article_once(self):
+        url = reverse('blog:article_update', kwargs={'slug': 'titre'})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.article_selects(queries)), 1)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, self.edit_data(status='published'))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(self.article_selects(queries)), 1)
+
+    def test_edit_view_writes_only_changed_fields(self):
+        url = reverse('blog:article_update', kwargs={'slug': 'titre'})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, self.edit_data(status='published'))
+        self.assertEqual(response.status_code, 302)
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"status"', updates[0])
+        self.assertNotIn('"content"', updates[0])
+        self.assertNotIn('"title"', updates[0])
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.status, 'published')
+        self.assertEqual(self.article.version, 2)
+
+    def test_edit_view_stale_version_shows_form_error(self):
+        self.article.save_changes(['content'], 1)
+        url = reverse('blog:article_update', kwargs={'slug': 'titre'})
+        response = self.client.post(url, self.edit_data(slug='nouveau-slug', status='published', version=1))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].non_field_errors())
+        # La version soumise est conservée : un second clic échoue aussi
+        self.assertEqual(response.context['version'], 1)
+        self.assertEqual(response.context['object'].slug, 'titre')
+        response = self.client.post(url, self.edit_data(status='published', version=1))
+        self.assertEqual(response.status_code, 200)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.status, 'draft')
+
+    def test_edit_view_missing_version_is_a_conflict(self):
+        url = reverse('blog:article_update', kwargs={'slug': 'titre'})
+        data = self.edit_data(status='published')
+        del data['version']
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].non_field_errors())
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.status, 'draft')
+
+    def upload(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (1, 1)).save(buffer, 'PNG')
+        return SimpleUploadedFile('couverture.png', buffer.getvalue(), content_type='image/png')
+
+    def test_edit_view_image_upload(self):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            url = reverse('blog:article_update', kwargs={'slug': 'titre'})
+            response = self.client.post(url, self.edit_data(image=self.upload()))
+            self.assertEqual(response.status_code, 302)
+            self.article.refresh_from_db()
+            self.assertTrue(os.path.exists(self.article.image.path))
+
+    def test_edit_view_conflict_does_not_store_image(self):
+        self.article.save_changes(['content'], 1)
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            url = reverse('blog:article_update', kwargs={'slug': 'titre'})
+            response = self.client.post(url, self.edit_data(image=self.upload(), version=1))
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(os.path.exists(os.path.join(media_root, 'articles')))
+
+    def quick_update(self, payload):
+        url = reverse('blog:article_quick_update', kwargs={'slug': 'titre'})
+        return self.client.patch(url, json.dumps(payload), content_type='application/json')
+
+    def test_quick_update(self):
+        response = self.quick_update({'version': 1, 'status': 'published'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['version'], 2)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.status, 'published')
+
+    def test_quick_update_makes_two_queries_on_article(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.quick_update({'version': 1, 'status': 'published'})
+        self.assertEqual(response.status_code, 200)
+        article_queries = [q['sql'] for q in queries if '"blog_article"' in q['sql']]
+        self.assertEqual(len(article_queries), 2)
+        self.assertTrue(article_queries[0].startswith('SELECT'))
+        self.assertTrue(article_queries[1].startswith('UPDATE'))
+
+    def test_quick_update_requires_login(self):
+        self.client.logout()
+        response = self.quick_update({'version': 1, 'status': 'published'})
+        self.assertEqual(response.status_code, 401)
+
+    def test_quick_update_requires_author(self):
+        User.objects.create_user('autre', password='secret')
+        self.client.login(username='autre', password='secret')
+        response = self.quick_update({'version': 1, 'status': 'published'})
+        self.assertEqual(response.status_code, 403)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.status, 'draft')
+
+    def test_quick_update_requires_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        client.login(username='auteur', password='secret')
+        url = reverse('blog:article_quick_update', kwargs={'slug': 'titre'})
+        payload = json.dumps({'version': 1, 'status': 'published'})
+        response = client.patch(url, payload, content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+        # Les appels JavaScript doivent envoyer l'en-tête X-CSRFToken
+        client.get(reverse('blog:article_update', kwargs={'slug': 'titre'}))
+        token = client.cookies['csrftoken'].value
+        response = client.patch(url, payload, content_type='application/json', HTTP_X_CSRFTOKEN=token)
+        self.assertEqual(response.status_code, 200)
+
+    def test_quick_update_stale_version_returns_409(self):
+        self.article.save_changes(['content'], 1)
+        response = self.quick_update({'version': 1, 'status': 'published'})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['version'], 2)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.status, 'draft')
+
+    def test_quick_update_invalid_payload_returns_400(self):
+        for payload in ({'version': 1, 'status': []}, [1], {'status': 'published'},
+                        {'version': 1, 'published_at': 12}, {'version': True, 'status': 'published'},
+                        {'version': 0, 'status': 'published'}):
+            response = self.quick_update(payload)
+            self.assertEqual(response.status_code, 400, payload)
@@ -19,6 +19,9 @@ urlpatterns = [
     # Modifier un article
     path('article/<slug:slug>/edit/', views.ArticleUpdateView.as_view(), name='article_update'),
     
+    # Modification rapide (JSON) du statut ou de la date de publication
+    path('article/<slug:slug>/quick-update/', views.article_quick_update, name='article_quick_update'),
+    
     # Supprimer un article
     path('article/<slug:slug>/delete/', views.ArticleDeleteView.as_view(), name='article_delete'),
     
@@ -1,3 +1,6 @@
+import copy
+import json
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.decorators import login_required
@@ -9,6 +12,9 @@ from .models import Article, Comment
 from .forms import CommentForm
 from django.contrib.auth.decorators import user_passes_test
 from django.core.paginator import Paginator
+from django.http import JsonResponse
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_http_methods
 
 class ArticleListView(ListView):
     """
@@ -77,19 +83,64 @@ class ArticleUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     template_name = 'blog/article_form.html'
     fields = ['title', 'slug', 'content', 'image', 'status', 'published_at']
     
+    def get_object(self, queryset=None):
+        """
+        Charge l'article une seule fois par requête (test_func puis get/post)
+        """
+        if not hasattr(self, '_article'):
+            self._article = super().get_object(queryset)
+        return self._article
+    
     def test_func(self):
         """
         Vérifie que l'utilisateur est l'auteur ou un superuser
         """
         article = self.get_object()
-        return self.request.user == article.author or self.request.user.is_superuser
+        return self.request.user.pk == article.author_id or self.request.user.is_superuser
+    
+    def get_submitted_version(self):
+        """
+        Version envoyée par le formulaire, ou None si absente ou invalide
+        """
+        try:
+            return int(self.request.POST['version'])
+        except (KeyError, ValueError):
+            return None
+    
+    def get_form_kwargs(self):
+        """
+        Le formulaire travaille sur une copie : self.object reste intact
+        (slug et titre d'origine) si la page doit être réaffichée
+        """
+        kwargs = super().get_form_kwargs()
+        kwargs['instance'] = copy.copy(self.object)
+        return kwargs
+    
+    def get_context_data(self, **kwargs):
+        """
+        Sur un POST, renvoie la version soumise et jamais celle relue en base :
+        l'utilisateur doit recharger la page pour voir les changements des autres
+        """
+        context = super().get_context_data(**kwargs)
+        if self.request.method == 'POST':
+            context['version'] = self.get_submitted_version()
+        else:
+            context['version'] = self.object.version
+        return context
     
     def form_valid(self, form):
         """
-        Message de succès après modification
+        Enregistre uniquement les champs modifiés, en détectant les modifications concurrentes
         """
+        version = self.get_submitted_version()
+        if version is None or (form.changed_data and not form.instance.save_changes(form.changed_data, version)):
+            form.add_error(None, "⚠️ Cet article a été modifié par quelqu'un d'autre entre-temps. "
+                                 "Rechargez la page avant d'enregistrer vos modifications.")
+            return self.form_invalid(form)
+        
+        self.object = form.instance
         messages.success(self.request, '✅ Votre article a été modifié avec succès !')
-        return super().form_valid(form)
+        return redirect(self.get_success_url())
 
 class ArticleDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
     """
@@ -113,6 +164,71 @@ class ArticleDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
         messages.success(request, '✅ Votre article a été supprimé avec succès !')
         return super().delete(request, *args, **kwargs)
 
+@require_http_methods(['PATCH', 'POST'])
+def article_quick_update(request, slug):
+    """
+    Vue JSON pour modifier rapidement le statut ou la date de publication
+    
+    Corps attendu : {"version": 3, "status": "published", "published_at": "2025-11-01T10:00"}
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentification requise.'}, status=401)
+    
+    # Ne charge pas le contenu ni l'image : inutiles pour ce type de modification
+    article = get_object_or_404(
+        Article.objects.only('id', 'slug', 'author_id', 'status', 'published_at', 'version'),
+        slug=slug
+    )
+    if request.user.pk != article.author_id and not request.user.is_superuser:
+        return JsonResponse({'error': 'Permission refusée.'}, status=403)
+    
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        data = None
+    # type() et non isinstance() : un booléen ne doit pas passer pour une version
+    if not isinstance(data, dict) or type(data.get('version')) is not int or data['version'] < 1:
+        return JsonResponse({'error': 'JSON invalide ou version manquante.'}, status=400)
+    version = data['version']
+    
+    changed = []
+    if 'status' in data:
+        if not isinstance(data['status'], str) or data['status'] not in dict(Article.STATUS_CHOICES):
+            return JsonResponse({'error': 'Statut invalide.'}, status=400)
+        article.status = data['status']
+        changed.append('status')
+    
+    if 'published_at' in data:
+        published_at = None
+        if isinstance(data['published_at'], str):
+            try:
+                published_at = parse_datetime(data['published_at'])
+            except ValueError:
+                pass
+        if published_at is None:
+            return JsonResponse({'error': 'Date de publication invalide.'}, status=400)
+        if timezone.is_naive(published_at):
+            published_at = timezone.make_aware(published_at)
+        article.published_at = published_at
+        changed.append('published_at')
+    
+    if not changed:
+        return JsonResponse({'error': 'Aucun champ à modifier (status, published_at).'}, status=400)
+    
+    if not article.save_changes(changed, version):
+        current = Article.objects.filter(pk=article.pk).values_list('version', flat=True).first()
+        return JsonResponse({
+            'error': "Cet article a été modifié par quelqu'un d'autre entre-temps.",
+            'version': current,
+        }, status=409)
+    
+    return JsonResponse({
+        'slug': article.slug,
+        'status': article.status,
+        'published_at': article.published_at.isoformat(),
+        'version': article.version,
+    })
+
 @login_required
 def add_comment(request, slug):
     """